@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# Run pygame headless and import the game module from the repository root
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def spawn():
+    """Factory that puts an enemy missile with the given word into a game"""
+    import mtypattk
+    
+    def spawn(game, word, y=0):
+        missile = game.enemy_missile_pool.acquire(100, 300, 500, word, mtypattk.RED)
+        missile.y = y
+        game.enemy_missiles.append(missile)
+        game.matcher.add(missile)
+        return missile
+    return spawn
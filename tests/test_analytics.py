@@ -0,0 +1,52 @@
+import pytest
+
+import mtypattk
+
+
+def make_game(tmp_path):
+    log_path = tmp_path / 'typing.log'
+    game = mtypattk.Game(adaptive_difficulty=False, sound=False,
+                         analytics_log=str(log_path))
+    return game, log_path
+
+
+@pytest.mark.parametrize('key, logged', [('ж', 'ж'), ('Ж', 'ж'), ('İ', 'İ')])
+def test_non_ascii_letter_is_logged(tmp_path, key, logged):
+    game, log_path = make_game(tmp_path)
+    game.process_keystrokes([(0.0, 0, key)])
+    game.analytics.close()
+    
+    (player, start, events), = mtypattk.read_typing_log(log_path)
+    assert list(events['kind']) == [mtypattk.EVENT_MISTYPE]
+    assert chr(events['char'][0]) == logged
+
+
+def test_keys_and_completed_word_round_trip(tmp_path, spawn):
+    game, log_path = make_game(tmp_path)
+    spawn(game, "cat")
+    game.process_keystrokes([(0.0, 0, ch) for ch in "cat"])
+    game.analytics.close()
+    
+    (player, start, events), = mtypattk.read_typing_log(log_path)
+    assert player == "player"
+    assert list(events['kind']) == [mtypattk.EVENT_KEY] * 3 + [mtypattk.EVENT_WORD_COMPLETE]
+    assert "".join(chr(c) for c in events['char'][:3]) == "cat"
+    assert game.analytics.stats.words_completed == 1
+
+
+def test_bad_log_path_fails_at_startup(tmp_path):
+    with pytest.raises(OSError):
+        mtypattk.TypingEventLog(str(tmp_path / 'missing' / 'typing.log'), "player")
+
+
+def test_close_does_not_block_when_writer_is_gone(tmp_path, monkeypatch):
+    monkeypatch.setattr(mtypattk, 'LOG_CLOSE_TIMEOUT', 0.05)
+    log = mtypattk.TypingEventLog(str(tmp_path / 'typing.log'), "player", chunk=1)
+    log.queue.put(None)
+    log.writer.join()
+    
+    # Nothing drains the queue now; recording must drop and closing must return
+    for i in range(mtypattk.ANALYTICS_QUEUE_SIZE + 10):
+        log.record(float(i), mtypattk.EVENT_KEY, ord('a'), -1, 0.0)
+    assert log.dropped > 0
+    log.close()
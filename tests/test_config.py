@@ -0,0 +1,111 @@
+import pytest
+
+import mtypattk
+
+
+@pytest.fixture
+def settings():
+    # apply_settings rebinds module constants; put them back afterwards
+    saved = mtypattk.default_settings()
+    yield
+    mtypattk.apply_settings(saved)
+
+
+@pytest.mark.parametrize('growth_rate', [2, 7, 13.5])
+@pytest.mark.parametrize('x', [300, 300.5, 359.5])
+def test_explosion_grid_finds_every_hit(settings, growth_rate, x):
+    mtypattk.apply_settings({'explosion_growth_rate': growth_rate})
+    explosion = mtypattk.Explosion(x, 300)
+    grid = mtypattk.SpatialGrid(mtypattk.EXPLOSION_MAX_RADIUS)
+    while explosion.update():
+        assert explosion.radius <= explosion.max_radius
+        grid.clear()
+        grid.insert(explosion, explosion.x, explosion.y)
+        for dx in range(-80, 81):
+            point = (explosion.x + dx, explosion.y)
+            if explosion.collides_with(*point):
+                assert explosion in grid.query(*point)
+
+
+def spawns_in(seconds):
+    game = mtypattk.Game(adaptive_difficulty=False, sound=False)
+    for _ in range(int(seconds * mtypattk.FPS)):
+        game.update()
+    return game.missiles_spawned_this_level
+
+
+def test_low_power_profile_keeps_wave_pacing(settings):
+    expected = spawns_in(10)
+    mtypattk.apply_settings(mtypattk.load_config(profile='low-power'))
+    assert mtypattk.FPS == 30
+    assert spawns_in(10) == expected
+    assert mtypattk.scale_frames(mtypattk.DIFFICULTY_INTERVAL) == 30
+
+
+class FrameCounter:
+    def __init__(self):
+        self.sizes = []
+    
+    def submit(self, index, rgb, width, height):
+        assert len(rgb) == width * height * 3
+        self.sizes.append((width, height))
+    
+    def close(self):
+        pass
+
+
+def test_replay_records_the_playfield_in_use(tmp_path, settings):
+    path = str(tmp_path / 'game.replay')
+    game = mtypattk.Game(640, 480, num_cities=4, num_bases=2, sound=False, replay_path=path)
+    game.replay.start(game.snapshot(), game.difficulty.adaptive, game.settings())
+    game.replay.close(30)
+    
+    recorded, snapshot, adaptive, events = mtypattk.read_replay(path)
+    assert (recorded['playfield_width'], recorded['playfield_height']) == (640, 480)
+    assert (recorded['cities'], recorded['bases']) == (4, 2)
+    
+    exporter = FrameCounter()
+    mtypattk.export_replay(path, exporter)
+    assert exporter.sizes == [(640, 480)] * 30
+
+
+def test_load_config_layers_file_then_profile(tmp_path):
+    path = tmp_path / 'engine.json'
+    path.write_text('{"fps": 50, "audio_buffer": 256, "profile": "low-latency-audio"}')
+    loaded = mtypattk.load_config(str(path))
+    assert loaded['fps'] == 50
+    assert loaded['audio_buffer'] == 128  # The profile wins over the file
+    assert mtypattk.load_config(str(path), 'default')['audio_buffer'] == 256
+
+
+def test_load_config_reads_toml_profiles(tmp_path):
+    pytest.importorskip('tomllib')
+    path = tmp_path / 'engine.toml'
+    path.write_text('profile = "arcade"\n[profiles.arcade]\ncities = 8\n')
+    assert mtypattk.load_config(str(path))['cities'] == 8
+
+
+@pytest.mark.parametrize('values, message', [
+    ({'fps': 5}, "between"),
+    ({'fps': 60.5}, "whole number"),
+    ({'fps': True}, "number"),
+    ({'fps': "60"}, "number"),
+    ({'audio_buffer': 500}, "power of two"),
+    ({'frame_skip': 1}, "unknown setting"),
+    ([1, 2], "table"),
+])
+def test_validate_settings_rejects_bad_values(values, message):
+    with pytest.raises(ValueError, match=message):
+        mtypattk.validate_settings(values, "test")
+
+
+def test_load_config_rejects_bad_input(tmp_path):
+    path = tmp_path / 'engine.json'
+    path.write_text('{"explosion_max_radius": 0}')
+    with pytest.raises(ValueError, match="explosion_max_radius"):
+        mtypattk.load_config(str(path))
+    with pytest.raises(ValueError, match="unknown profile"):
+        mtypattk.load_config(profile='turbo')
+    path.write_text('{"profiles": {"broken": {"cities": -1}}}')
+    with pytest.raises(ValueError, match="broken"):
+        mtypattk.load_config(str(path))
@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import pytest
+
+import mtypattk
+
+
+def make_game(level=1, in_flight=0):
+    return SimpleNamespace(level=level, enemy_spawn_rate=mtypattk.level_spawn_rate(level),
+                           analytics=SimpleNamespace(stats=mtypattk.TypingStats("player")),
+                           enemy_missiles=[None] * in_flight)
+
+
+def run_interval(controller, game, chars=0, completed=0, missed=0):
+    """Add typing counts, then step the controller through one measurement"""
+    stats = game.analytics.stats
+    stats.chars_typed += chars
+    stats.words_completed += completed
+    stats.words_missed += missed
+    interval = mtypattk.scale_frames(mtypattk.DIFFICULTY_INTERVAL)
+    results = [controller.update(game) for _ in range(interval)]
+    assert results == [False] * (interval - 1) + [True]
+
+
+def test_fixed_difficulty_follows_level_schedule():
+    controller = mtypattk.DifficultyController(adaptive=False)
+    game = make_game(level=3)
+    assert controller.update(game) is False
+    assert controller.spawn_rate == game.enemy_spawn_rate
+    assert controller.word_length_cap == 7
+    assert controller.max_concurrent is None
+
+
+def test_neutral_interval_keeps_schedule():
+    controller = mtypattk.DifficultyController()
+    game = make_game()
+    run_interval(controller, game)
+    assert controller.pressure == 1.0
+    assert controller.spawn_rate == game.enemy_spawn_rate
+    assert controller.word_length_cap == 5
+    assert controller.max_concurrent == 8
+
+
+def test_fast_accurate_typing_raises_pressure():
+    controller = mtypattk.DifficultyController()
+    game = make_game()
+    for _ in range(5):
+        run_interval(controller, game, chars=30, completed=6)
+    assert controller.chars_per_sec == pytest.approx(30)
+    assert controller.miss_rate == 0.0
+    assert controller.pressure == pytest.approx(1.05 ** 5)
+    assert controller.spawn_rate < game.enemy_spawn_rate
+    assert controller.word_length_cap == 6
+    assert controller.max_concurrent > 8
+
+
+def test_slow_typing_only_counts_active_intervals():
+    controller = mtypattk.DifficultyController()
+    game = make_game()
+    run_interval(controller, game, chars=1)  # Well under the demand
+    run_interval(controller, game)  # Idle intervals are ignored
+    assert controller.chars_per_sec == pytest.approx(1)
+    assert controller.pressure == 1.0
+
+
+def test_misses_lower_pressure_down_to_minimum():
+    controller = mtypattk.DifficultyController()
+    game = make_game()
+    run_interval(controller, game, completed=1, missed=1)
+    assert controller.miss_rate == pytest.approx(0.1)  # Smoothed towards 0.5
+    assert controller.pressure == 1.0  # Not yet above TARGET_MISS_RATE
+    run_interval(controller, game, completed=1, missed=1)
+    assert controller.pressure == pytest.approx(0.9)
+    
+    for _ in range(30):
+        run_interval(controller, game, missed=2)
+    assert controller.pressure == mtypattk.MIN_PRESSURE
+    assert controller.spawn_rate == min(mtypattk.scale_frames(mtypattk.MAX_SPAWN_RATE),
+                                        int(game.enemy_spawn_rate / mtypattk.MIN_PRESSURE))
+    assert controller.word_length_cap == 3
+    assert controller.max_concurrent == mtypattk.MIN_CONCURRENT_MISSILES + 1
+
+
+def test_pressure_is_capped_at_maximum():
+    controller = mtypattk.DifficultyController()
+    game = make_game(level=10)
+    for _ in range(60):
+        run_interval(controller, game, chars=200, completed=40)
+    assert controller.pressure == mtypattk.MAX_PRESSURE
+    assert controller.spawn_rate == mtypattk.scale_frames(mtypattk.MIN_SPAWN_RATE)
+    assert controller.word_length_cap == 12
+
+
+def test_frame_load_caps_and_relaxes_missiles_in_flight():
+    controller = mtypattk.DifficultyController()
+    game = make_game(level=5, in_flight=10)
+    for _ in range(50):
+        controller.add_frame_time(0.016, 1 / 60)  # Over budget
+    assert controller.frame_load > mtypattk.FRAME_LOAD_HIGH
+    run_interval(controller, game)
+    assert controller.performance_cap == 9
+    assert controller.max_concurrent == 9
+    
+    # Between the thresholds the cap holds
+    for _ in range(50):
+        controller.add_frame_time(0.7 / 60, 1 / 60)
+    run_interval(controller, game)
+    assert controller.performance_cap == 9
+    
+    # Below FRAME_LOAD_LOW it relaxes by at least one per interval
+    for _ in range(50):
+        controller.add_frame_time(0.001, 1 / 60)
+    run_interval(controller, game)
+    assert controller.performance_cap == 10
+    for _ in range(10):
+        run_interval(controller, game)
+    assert controller.max_concurrent == 16  # Back to the skill cap
+    
+    # The cap never sheds below the minimum
+    game.enemy_missiles = []
+    for _ in range(50):
+        controller.add_frame_time(0.02, 1 / 60)
+    run_interval(controller, game)
+    assert controller.performance_cap == mtypattk.MIN_CONCURRENT_MISSILES
@@ -0,0 +1,57 @@
+import io
+import os
+
+import numpy as np
+import pygame
+import pytest
+
+import mtypattk
+
+
+def test_pipe_exporter_stops_when_encoder_exits():
+    exporter = mtypattk.PipeExporter("head -c 10")
+    frame = bytes(64 * 48 * 3)
+    with pytest.raises(BrokenPipeError):
+        for index in range(1000):
+            exporter.submit(index, frame, 64, 48)
+    with pytest.raises(BrokenPipeError):
+        exporter.close()
+
+
+def test_pipe_exporter_writes_every_frame(tmp_path):
+    path = tmp_path / 'frames.rgb'
+    exporter = mtypattk.PipeExporter(f"dd of={path} status=none")
+    frames = [bytes([index]) * (8 * 4 * 3) for index in range(20)]
+    for index, frame in enumerate(frames):
+        exporter.submit(index, frame, 8, 4)
+    exporter.close()
+    assert path.read_bytes() == b"".join(frames)
+
+
+def random_frame(width, height, seed):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, width * height * 3, dtype=np.uint8).tobytes()
+
+
+def decode_png(data):
+    image = pygame.image.load(io.BytesIO(data), 'frame.png')
+    return image.get_size(), pygame.image.tobytes(image, 'RGB')
+
+
+@pytest.mark.parametrize('level', [0, mtypattk.EXPORT_PNG_LEVEL, 9])
+def test_encode_png_round_trips(level):
+    rgb = random_frame(37, 21, level)
+    assert decode_png(mtypattk.encode_png(rgb, 37, 21, level)) == ((37, 21), rgb)
+
+
+def test_image_sequence_exporter_writes_numbered_frames(tmp_path):
+    exporter = mtypattk.ImageSequenceExporter(str(tmp_path), workers=2)
+    frames = [random_frame(16, 9, index) for index in range(1, 11)]
+    for index, rgb in enumerate(frames, 1):
+        exporter.submit(index, rgb, 16, 9)
+    exporter.close()
+    
+    assert sorted(os.listdir(tmp_path)) == [f"frame_{index:06d}.png" for index in range(1, 11)]
+    for index, rgb in enumerate(frames, 1):
+        data = (tmp_path / f"frame_{index:06d}.png").read_bytes()
+        assert decode_png(data) == ((16, 9), rgb)
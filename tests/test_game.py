@@ -0,0 +1,9 @@
+import mtypattk
+
+
+def test_narrow_playfield_spawns_inside_bounds():
+    game = mtypattk.Game(90, 300, adaptive_difficulty=False, sound=False)
+    for _ in range(20):
+        game.spawn_enemy_missile()
+    assert game.enemy_missiles
+    assert all(0 <= missile.start_x <= game.width for missile in game.enemy_missiles)
@@ -0,0 +1,123 @@
+import pygame
+import pytest
+
+import mtypattk
+
+
+@pytest.fixture
+def game():
+    game = mtypattk.Game(adaptive_difficulty=False, sound=False)
+    game.enemy_missile_pool.release_all(game.enemy_missiles)
+    game.enemy_missiles = []
+    return game
+
+
+def type_keys(game, text):
+    game.process_keystrokes([(0.0, 0, ch) for ch in text])
+
+
+def press(game, key):
+    game.process_keystrokes([(0.0, key, "")])
+
+
+def test_prefix_tracks_every_candidate(game, spawn):
+    cat, car, dog = spawn(game, "cat"), spawn(game, "car", 10), spawn(game, "dog")
+    type_keys(game, "ca")
+    assert game.matcher.candidates == [cat, car]
+    assert (cat.typed_chars, car.typed_chars, dog.typed_chars) == (2, 2, 0)
+    assert game.targeted_missile is car  # Closest to the ground
+    
+    type_keys(game, "t")
+    assert game.current_input == ""
+    assert len(game.player_missiles) == 1
+    assert cat.typed_chars == car.typed_chars == 0
+
+
+def test_mistype_is_rejected(game, spawn):
+    spawn(game, "cat")
+    type_keys(game, "cx")
+    assert game.current_input == "c"
+    assert game.analytics.stats.mistypes == 1
+
+
+def test_backspace_restores_previous_candidates(game, spawn):
+    cat, cow = spawn(game, "cat"), spawn(game, "cow")
+    type_keys(game, "ca")
+    assert game.matcher.candidates == [cat]
+    press(game, pygame.K_BACKSPACE)
+    assert game.current_input == "c"
+    assert game.matcher.candidates == [cat, cow]
+    assert cat.typed_chars == cow.typed_chars == 1
+    press(game, pygame.K_BACKSPACE)
+    press(game, pygame.K_BACKSPACE)
+    assert game.current_input == "" and cat.typed_chars == 0
+
+
+def test_shared_prefix_waits_for_next_key(game, spawn):
+    go, golang = spawn(game, "go"), spawn(game, "golang")
+    type_keys(game, "go")
+    assert game.matcher.pending is go
+    assert not game.player_missiles
+    
+    # Continuing the longer word leaves the short one alone
+    type_keys(game, "l")
+    assert game.matcher.pending is None
+    assert game.matcher.candidates == [golang]
+    press(game, pygame.K_BACKSPACE)
+    
+    # Space confirms the short word
+    press(game, pygame.K_SPACE)
+    assert len(game.player_missiles) == 1
+    assert game.current_input == ""
+
+
+def test_type_ahead_fires_pending_word_and_starts_next(game, spawn):
+    spawn(game, "go")
+    spawn(game, "golang")
+    cat = spawn(game, "cat")
+    type_keys(game, "goc")
+    assert len(game.player_missiles) == 1
+    assert game.current_input == "c"
+    assert game.matcher.candidates == [cat]
+
+
+def test_new_missile_joins_current_prefix(game, spawn):
+    spawn(game, "gold")
+    type_keys(game, "go")
+    golf = spawn(game, "golf")
+    assert golf.typed_chars == 2
+    assert golf in game.matcher.candidates
+
+
+def test_removed_rival_fires_pending_word(game, spawn):
+    spawn(game, "go")
+    golang = spawn(game, "golang")
+    type_keys(game, "go")
+    golang.y = game.ground_y  # Lands on the next update
+    game.update()
+    assert golang not in game.enemy_missiles
+    assert len(game.player_missiles) == 1
+    assert game.current_input == ""
+
+
+def test_removed_last_candidate_clears_input(game, spawn):
+    cat = spawn(game, "cat")
+    type_keys(game, "ca")
+    cat.y = game.ground_y
+    game.update()
+    assert game.current_input == ""
+    assert not game.matcher.candidates
+
+
+def test_shots_wait_for_a_base(game, spawn):
+    cat = spawn(game, "cat")
+    for base in game.bases:
+        base.active = False
+    type_keys(game, "cat")
+    assert [missile for missile, _ in game.shot_queue] == [cat]
+    assert not game.player_missiles
+    
+    game.bases[0].active = True
+    game.update()
+    assert not game.shot_queue
+    assert len(game.player_missiles) == 1
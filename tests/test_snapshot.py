@@ -0,0 +1,67 @@
+import struct
+
+import pytest
+
+import mtypattk
+
+
+@pytest.fixture
+def game():
+    game = mtypattk.Game(adaptive_difficulty=False, sound=False)
+    # Play a little so there are missiles, explosions and a half-typed word
+    for frame in range(400):
+        game.update()
+        if frame % 50 == 49 and game.enemy_missiles:
+            word = game.enemy_missiles[0].word
+            game.process_keystrokes([(0.0, 0, ch) for ch in word])
+    if game.enemy_missiles:
+        game.process_keystrokes([(0.0, 0, game.enemy_missiles[-1].word[0])])
+    return game
+
+
+def test_restore_round_trips(game):
+    data = game.snapshot()
+    game.restore(data)
+    assert game.snapshot() == data
+
+
+def test_restore_replays_identically(game):
+    data = game.snapshot()
+    for _ in range(200):
+        game.update()
+    expected = game.snapshot()
+    game.restore(data)
+    for _ in range(200):
+        game.update()
+    assert game.snapshot() == expected
+
+
+def test_old_version_is_rejected(game):
+    data = bytearray(game.snapshot())
+    struct.pack_into('<H', data, 4, mtypattk.SNAPSHOT_VERSION - 1)
+    with pytest.raises(ValueError, match="version"):
+        game.restore(bytes(data))
+
+
+def test_other_playfield_is_rejected(game):
+    other = mtypattk.Game(640, 480, adaptive_difficulty=False, sound=False)
+    with pytest.raises(ValueError, match="playfield"):
+        other.restore(game.snapshot())
+
+
+@pytest.mark.parametrize('fraction', [0, 0.01, 0.5, 0.99])
+def test_truncated_snapshot_leaves_game_unchanged(game, fraction):
+    data = game.snapshot()
+    with pytest.raises((ValueError, struct.error)):
+        game.restore(data[:int(len(data) * fraction)])
+    assert game.snapshot() == data
+
+
+def test_snapshot_writer_replaces_file(tmp_path, game):
+    path = str(tmp_path / 'game.snap')
+    writer = mtypattk.SnapshotWriter(path)
+    writer.submit(game.snapshot())
+    writer.close()
+    game.load_snapshot(path)
+    with open(path, 'rb') as f:
+        assert f.read() == game.snapshot()